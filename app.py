@@ -1,90 +1,152 @@
 import streamlit as st
+import altair as alt
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import MinMaxScaler
 
 # ======================================================
 # UTILITY FUNCTIONS
 # ======================================================
 
+def top_n_indices(scores, n):
+    """
+    Mengambil indeks n skor tertinggi (urut menurun) tanpa mengurutkan seluruh array.
+    Untuk array 2D, top-N dihitung untuk semua baris sekaligus.
+    Skor yang sama diurutkan berdasarkan indeks terkecil (sama dengan argsort stabil)
+    """
+    n = min(n, scores.shape[-1])
+    # Nilai ke-n terbesar per baris sebagai batas seleksi
+    kth = -np.partition(-scores, n - 1, axis=-1)[..., n - 1:n]
+    greater = scores > kth
+    equal = scores == kth
+    # Di batas seleksi, ambil skor yang sama dengan indeks terkecil lebih dulu
+    n_equal = n - greater.sum(axis=-1, keepdims=True)
+    selected = greater | (equal & (np.cumsum(equal, axis=-1) <= n_equal))
+    # Setiap baris tepat memiliki n kandidat, np.nonzero mengembalikannya urut indeks
+    idx = np.nonzero(selected)[-1].reshape(scores.shape[:-1] + (n,))
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(idx, order, axis=-1)
+
+def minmax_normalize(scores):
+    """
+    Normalisasi min-max ke rentang [0, 1]. Jika semua nilai sama, hasilnya nol (sama seperti MinMaxScaler)
+    """
+    lo, hi = scores.min(), scores.max()
+    if hi > lo:
+        return (scores - lo) / (hi - lo + 1e-12)
+    return np.zeros_like(scores)
+
+def csr_if_sparse(values, max_density=0.2):
+    """
+    Mengembalikan matriks sebagai CSR jika proporsi nilai non-zero di bawah max_density,
+    selain itu matriks dense dikembalikan apa adanya
+    """
+    if values.size and np.count_nonzero(values) / values.size < max_density:
+        return csr_matrix(values)
+    return values
+
+def index_bitmask(indices):
+    """
+    Membuat bitmask integer dari daftar indeks (bit ke-i menyala jika indeks i ada)
+    """
+    mask = 0
+    for i in indices:
+        mask |= 1 << int(i)
+    return mask
+
+def show_heatmap(df, figsize=(10, 5)):
+    """
+    Menampilkan heatmap DataFrame di Streamlit lalu menutup figure-nya
+    """
+    fig, ax = plt.subplots(figsize=figsize)
+    sns.heatmap(df, annot=True, cmap="YlGnBu", ax=ax)
+    st.pyplot(fig)
+    plt.close(fig)
+
+# Bobot (CBF, CF), judul, dan warna untuk tiap metode pada grafik perbandingan
+METHOD_WEIGHTS = np.array([
+    [1.0, 0.0],
+    [0.0, 1.0],
+    [0.5, 0.5],
+    [0.7, 0.3],
+])
+METHOD_TITLES = [
+    "Content-Based Filtering (100% CBF)",
+    "Collaborative Filtering (100% CF)",
+    "Simple Average (50% CBF + 50% CF)",
+    "Weighted Average (70% CBF + 30% CF)",
+]
+METHOD_COLORS = ["#3498db", "#e74c3c", "#2ecc71", "#9b59b6"]
+
+def combine_method_scores(cbf_scores_norm, cf_scores_norm):
+    """
+    Menghitung skor keempat metode sekaligus dalam satu perkalian matriks.
+    Input (U, K) menghasilkan (U, 4, K); input satu user (K,) menghasilkan (4, K)
+    """
+    stacked = np.stack([cbf_scores_norm, cf_scores_norm], axis=-1)
+    return np.swapaxes(stacked @ METHOD_WEIGHTS.T, -1, -2)
+
 def plot_method_comparison(df_komunitas, cbf_scores_norm, cf_scores_norm, user_idx=0, top_n=5):
     """
     Membandingkan hasil rekomendasi dari berbagai metode dalam satu grafik
+    (Altair, dirender di browser)
     """
-    # Ambil top N rekomendasi dari masing-masing metode
-    # CBF Only
-    cbf_indices = np.argsort(cbf_scores_norm[user_idx])[::-1][:top_n]
-    cbf_communities = [df_komunitas["nama_komunitas"].iloc[i] for i in cbf_indices]
-    cbf_scores = [cbf_scores_norm[user_idx, i] for i in cbf_indices]
-    
-    # CF Only
-    cf_indices = np.argsort(cf_scores_norm[user_idx])[::-1][:top_n]
-    cf_communities = [df_komunitas["nama_komunitas"].iloc[i] for i in cf_indices]
-    cf_scores = [cf_scores_norm[user_idx, i] for i in cf_indices]
-    
-    # Simple Average
-    avg_scores = (cbf_scores_norm[user_idx] + cf_scores_norm[user_idx]) / 2
-    avg_indices = np.argsort(avg_scores)[::-1][:top_n]
-    avg_communities = [df_komunitas["nama_komunitas"].iloc[i] for i in avg_indices]
-    avg_scores_values = [avg_scores[i] for i in avg_indices]
-    
-    # Weighted (70% CBF, 30% CF)
-    weighted_scores = 0.7 * cbf_scores_norm[user_idx] + 0.3 * cf_scores_norm[user_idx]
-    weighted_indices = np.argsort(weighted_scores)[::-1][:top_n]
-    weighted_communities = [df_komunitas["nama_komunitas"].iloc[i] for i in weighted_indices]
-    weighted_scores_values = [weighted_scores[i] for i in weighted_indices]
-    
-    # Plot
-    fig, axs = plt.subplots(2, 2, figsize=(14, 10))
-    fig.suptitle('Perbandingan Hasil Rekomendasi dari Berbagai Metode', fontsize=16)
-    
-    # CBF Plot
-    axs[0, 0].barh(cbf_communities, cbf_scores, color='#3498db')
-    axs[0, 0].set_title('Content-Based Filtering (100% CBF)')
-    axs[0, 0].set_xlim(0, 1.0)
-    
-    # CF Plot
-    axs[0, 1].barh(cf_communities, cf_scores, color='#e74c3c')
-    axs[0, 1].set_title('Collaborative Filtering (100% CF)')
-    axs[0, 1].set_xlim(0, 1.0)
-    
-    # Simple Average Plot
-    axs[1, 0].barh(avg_communities, avg_scores_values, color='#2ecc71')
-    axs[1, 0].set_title('Simple Average (50% CBF + 50% CF)')
-    axs[1, 0].set_xlim(0, 1.0)
-    
-    # Weighted Average Plot
-    axs[1, 1].barh(weighted_communities, weighted_scores_values, color='#9b59b6')
-    axs[1, 1].set_title('Weighted Average (70% CBF + 30% CF)')
-    axs[1, 1].set_xlim(0, 1.0)
-    
-    # Adjust layout
-    plt.tight_layout(rect=[0, 0, 1, 0.95])
-    
-    return fig
+    names = df_komunitas["nama_komunitas"].to_numpy()
+    
+    # Skor user untuk keempat metode (dihitung sekali)
+    method_scores = combine_method_scores(cbf_scores_norm[user_idx], cf_scores_norm[user_idx])
+    
+    # Ambil top N rekomendasi dari keempat metode sekaligus
+    top_indices = top_n_indices(method_scores, top_n)
+    comparison_df = pd.DataFrame({
+        "Metode": np.repeat(METHOD_TITLES, top_indices.shape[1]),
+        "Komunitas": names[top_indices].ravel(),
+        "Skor": np.take_along_axis(method_scores, top_indices, axis=-1).ravel()
+    })
+    
+    # Plot: satu panel per metode, sumbu komunitas diurutkan per panel
+    chart = alt.Chart(comparison_df).mark_bar().encode(
+        x=alt.X("Skor:Q", scale=alt.Scale(domain=[0, 1.0])),
+        y=alt.Y("Komunitas:N", sort="-x", title=None),
+        color=alt.Color("Metode:N", scale=alt.Scale(domain=METHOD_TITLES, range=METHOD_COLORS), legend=None),
+        tooltip=["Komunitas", alt.Tooltip("Skor:Q", format=".4f")]
+    ).properties(
+        width=300,
+        height=180
+    ).facet(
+        facet=alt.Facet("Metode:N", sort=METHOD_TITLES, title=None),
+        columns=2
+    ).resolve_scale(
+        y="independent"
+    ).properties(
+        title="Perbandingan Hasil Rekomendasi dari Berbagai Metode"
+    )
+    
+    return chart
 
 def analyze_recommendation_overlap(df_komunitas, cbf_scores_norm, cf_scores_norm, user_idx, top_n=5):
     """
     Menganalisis overlap antara rekomendasi dari metode berbeda
     """
-    # Dapatkan indeks top N rekomendasi
-    cbf_top = np.argsort(cbf_scores_norm[user_idx])[::-1][:top_n]
-    cf_top = np.argsort(cf_scores_norm[user_idx])[::-1][:top_n]
-    avg_top = np.argsort((cbf_scores_norm[user_idx] + cf_scores_norm[user_idx])/2)[::-1][:top_n]
+    # Kode integer per nama komunitas (nama yang sama mendapat kode/bit yang sama)
+    name_codes, _ = pd.factorize(df_komunitas["nama_komunitas"])
+    
+    # Dapatkan indeks top N rekomendasi CBF, CF, dan Simple Average sekaligus
+    method_scores = combine_method_scores(cbf_scores_norm[user_idx], cf_scores_norm[user_idx])
+    cbf_top, cf_top, avg_top, _ = top_n_indices(method_scores, top_n)
     
-    # Dapatkan set komunitas
-    cbf_set = set([df_komunitas["nama_komunitas"].iloc[i] for i in cbf_top])
-    cf_set = set([df_komunitas["nama_komunitas"].iloc[i] for i in cf_top])
-    avg_set = set([df_komunitas["nama_komunitas"].iloc[i] for i in avg_top])
+    # Himpunan komunitas sebagai bitmask (satu bit per komunitas)
+    cbf_mask = index_bitmask(name_codes[cbf_top])
+    cf_mask = index_bitmask(name_codes[cf_top])
+    avg_mask = index_bitmask(name_codes[avg_top])
     
     # Hitung overlap
-    cbf_cf_overlap = len(cbf_set.intersection(cf_set))
-    avg_cbf_overlap = len(avg_set.intersection(cbf_set))
-    avg_cf_overlap = len(avg_set.intersection(cf_set))
+    cbf_cf_overlap = (cbf_mask & cf_mask).bit_count()
+    avg_cbf_overlap = (avg_mask & cbf_mask).bit_count()
+    avg_cf_overlap = (avg_mask & cf_mask).bit_count()
     
     # Buat analysis
     if cbf_cf_overlap == 0:
@@ -99,112 +161,145 @@ def analyze_recommendation_overlap(df_komunitas, cbf_scores_norm, cf_scores_norm
     
     # Return hasil analisis
     return {
-        "cbf_cf_overlap": f"{cbf_cf_overlap}/{min(len(cbf_set), len(cf_set))}",
-        "avg_cbf_overlap": f"{avg_cbf_overlap}/{len(avg_set)}",
-        "avg_cf_overlap": f"{avg_cf_overlap}/{len(avg_set)}",
+        "cbf_cf_overlap": f"{cbf_cf_overlap}/{min(cbf_mask.bit_count(), cf_mask.bit_count())}",
+        "avg_cbf_overlap": f"{avg_cbf_overlap}/{avg_mask.bit_count()}",
+        "avg_cf_overlap": f"{avg_cf_overlap}/{avg_mask.bit_count()}",
         "analysis": analysis,
         "dominance": dominance_analysis
     }
 
+def join_text_columns(df, cols):
+    """
+    Menggabungkan beberapa kolom teks menjadi satu string per baris (dipisah spasi)
+    """
+    joined = df[cols[0]].fillna("").astype(str)
+    for col in cols[1:]:
+        joined = joined.str.cat(df[col].fillna("").astype(str), sep=" ")
+    return joined
+
+@st.cache_data(show_spinner=False, max_entries=16)
 def preprocess_data_mahasiswa(df):
     """
     Preprocessing data mahasiswa
     """
+    # Bersihkan data yang tidak perlu
+    df = df.drop(columns=["Timestamp", "Email Address"], errors='ignore')
+    
+    # Kumpulkan kolom baru, lalu tambahkan sekaligus dengan df.assign
+    new_cols = {}
+    
     # Buat ID mahasiswa jika belum ada
     if "id_mahasiswa" not in df.columns:
         if "Mahasiswa" in df.columns:
-            df["id_mahasiswa"] = df["Mahasiswa"]
+            new_cols["id_mahasiswa"] = df["Mahasiswa"]
         else:
-            df["id_mahasiswa"] = [f"MHS_{i}" for i in range(len(df))]
+            new_cols["id_mahasiswa"] = np.char.add("MHS_", np.arange(len(df)).astype(str))
     
     # Buat kolom nama mahasiswa jika belum ada
     if "nama_mahasiswa" not in df.columns:
         if "Mahasiswa" in df.columns:
-            df["nama_mahasiswa"] = df["Mahasiswa"]
+            new_cols["nama_mahasiswa"] = df["Mahasiswa"]
         else:
-            df["nama_mahasiswa"] = df["id_mahasiswa"]
-    
-    # Bersihkan data yang tidak perlu
-    df.drop(columns=["Timestamp", "Email Address"], inplace=True, errors='ignore')
+            new_cols["nama_mahasiswa"] = new_cols["id_mahasiswa"] if "id_mahasiswa" in new_cols else df["id_mahasiswa"]
     
     # Pastikan kolom profil ada
     required_cols = ["passion", "pengetahuan_sebelumnya", "tim", "skill", "motivasi"]
     for col in required_cols:
         if col not in df.columns:
-            df[col] = ""
-    
-    # Buat profil gabungan
-    df["profil_mahasiswa"] = df[required_cols].fillna("").agg(" ".join, axis=1)
+            new_cols[col] = ""
     
-    return df
+    # Buat profil gabungan (dihitung setelah kolom di atas tersedia)
+    return df.assign(
+        **new_cols,
+        profil_mahasiswa=lambda d: join_text_columns(d, required_cols)
+    )
 
+@st.cache_data(show_spinner=False, max_entries=16)
 def preprocess_data_komunitas(df):
     """
     Preprocessing data komunitas
     """
+    # Kumpulkan kolom baru, lalu tambahkan sekaligus dengan df.assign
+    new_cols = {}
+    
     # Buat ID komunitas jika belum ada
     if "id_komunitas" not in df.columns:
-        df["id_komunitas"] = [f"KOM_{i}" for i in range(len(df))]
+        new_cols["id_komunitas"] = np.char.add("KOM_", np.arange(len(df)).astype(str))
     
     # Buat kategori jika belum ada
     if "kategori" not in df.columns:
-        df["kategori"] = "Umum"
+        new_cols["kategori"] = "Umum"
     
     # Pastikan kolom konten ada
     required_kom_cols = ["nama_komunitas", "deskripsi", "aktivitas", "teknologi", "visi_misi"]
     for col in required_kom_cols:
         if col not in df.columns:
-            df[col] = ""
-    
-    # Buat konten gabungan
-    df["konten_komunitas"] = df[required_kom_cols].fillna("").agg(" ".join, axis=1)
+            new_cols[col] = ""
     
-    return df
+    # Buat konten gabungan (dihitung setelah kolom di atas tersedia)
+    return df.assign(
+        **new_cols,
+        konten_komunitas=lambda d: join_text_columns(d, required_kom_cols)
+    )
 
 def standardize_rating_columns(df_mahasiswa, df_komunitas, original_rating_cols):
     """
     Standardisasi kolom rating dan memastikan konsistensi dengan komunitas
     """
     # Extract nama komunitas dari kolom rating
-    rating_to_komunitas = {}
-    for col in original_rating_cols:
-        if '[' in col and ']' in col:
-            kom_name = col.split('[')[1].split(']')[0].strip()
-            rating_to_komunitas[col] = kom_name
+    rating_cols = pd.Series(original_rating_cols, dtype=object)
+    kom_names = rating_cols.str.extract(r"\[([^\]]*)\]", expand=False).str.strip()
+    has_kom = kom_names.notna()
+    rating_to_komunitas = dict(zip(rating_cols[has_kom], kom_names[has_kom]))
     
     # Set komunitas unik
     unique_komunitas = list(set(rating_to_komunitas.values()))
     
+    # Lookup ID dan nama komunitas (dibuat sekali, bukan scan per komunitas)
+    kom_id_set = set(df_komunitas["id_komunitas"])
+    kom_name_to_idx = {}
+    for idx, nama in zip(df_komunitas.index, df_komunitas["nama_komunitas"]):
+        kom_name_to_idx.setdefault(nama, idx)
+    
     # Pastikan semua komunitas ada di dataframe komunitas
+    new_rows = []
     for kom in unique_komunitas:
-        if kom not in df_komunitas["id_komunitas"].values:
-            if kom not in df_komunitas["nama_komunitas"].values:
+        if kom not in kom_id_set:
+            if kom not in kom_name_to_idx:
                 # Tambahkan komunitas baru
-                new_row = {
+                new_rows.append({
                     "id_komunitas": kom,
                     "nama_komunitas": kom,
                     "deskripsi": f"Komunitas {kom}",
                     "kategori": "Umum",
                     "konten_komunitas": f"Komunitas {kom}"
-                }
-                df_komunitas = pd.concat([df_komunitas, pd.DataFrame([new_row])], ignore_index=True)
+                })
             else:
                 # Gunakan nama komunitas sebagai ID
-                kom_idx = df_komunitas[df_komunitas["nama_komunitas"] == kom].index[0]
-                df_komunitas.loc[kom_idx, "id_komunitas"] = kom
-    
+                df_komunitas.loc[kom_name_to_idx[kom], "id_komunitas"] = kom
+
+    # Gabungkan semua komunitas baru sekaligus
+    if new_rows:
+        df_komunitas = pd.concat([df_komunitas, pd.DataFrame(new_rows)], ignore_index=True)
+
     # Update list ID komunitas
     kom_ids = df_komunitas["id_komunitas"].tolist()
+    kom_id_set = set(kom_ids)
+    kom_pos = {kom_id: j for j, kom_id in enumerate(kom_ids)}
     
     # Buat kolom rating standar
     standardized_rating_cols = []
     
+    # Rating matrix (mahasiswa x komunitas) float32 yang kolomnya mengikuti urutan kom_ids
+    rating_values = np.zeros((len(df_mahasiswa), len(kom_ids)), dtype=np.float32)
+    
     # Map kolom rating yang ada ke format standar
     for orig_col, kom_name in rating_to_komunitas.items():
-        if kom_name in kom_ids:
+        if kom_name in kom_id_set:
             std_col = f"Rating_{kom_name}"
             df_mahasiswa[std_col] = df_mahasiswa[orig_col]
             standardized_rating_cols.append(std_col)
+            rating_values[:, kom_pos[kom_name]] = df_mahasiswa[orig_col].fillna(0).to_numpy(dtype=np.float32)
     
     # Tambahkan kolom rating yang belum ada
     for kom_id in kom_ids:
@@ -213,7 +308,386 @@ def standardize_rating_columns(df_mahasiswa, df_komunitas, original_rating_cols)
             df_mahasiswa[std_col] = 0.0
             standardized_rating_cols.append(std_col)
     
-    return df_mahasiswa, df_komunitas, standardized_rating_cols
+    return df_mahasiswa, df_komunitas, standardized_rating_cols, rating_values
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def default_komunitas_df(default_komunitas):
+    """
+    DataFrame komunitas default untuk mode input manual (dibuat sekali dan
+    dipakai bersama antar sesi, gunakan .copy() sebelum dimodifikasi)
+    """
+    df_komunitas = pd.DataFrame({
+        "id_komunitas": default_komunitas,
+        "nama_komunitas": default_komunitas,
+        "deskripsi": [
+            "Google Developer Student Clubs - Komunitas pengembang yang didukung Google untuk mahasiswa",
+            "Data Science Enthusiast - Komunitas untuk para penggemar ilmu data dan analitik",
+            "UINUX - Komunitas pengguna dan pengembang Linux dan perangkat lunak sumber terbuka",
+            "ETH0 - Komunitas keamanan siber dan ethical hacking",
+            "WEBONDER - Komunitas pengembangan web dan UI/UX",
+            "MOCAP - Komunitas pengembangan aplikasi mobile dan teknologi capture",
+            "ONTAKI - Komunitas robotika dan teknologi otomasi",
+            "FUN JAVA - Komunitas pemrograman Java dan pengembangan aplikasi",
+            "UINBUNTU - Komunitas Ubuntu dan pengembangan sistem operasi Linux",
+            "MAMUD - Komunitas multimedia dan desain digital"
+        ],
+        "aktivitas": [
+            "Workshop, Hackathon, Study Jam, Webinar",
+            "Bootcamp, Datathon, Pelatihan, Proyek Kolaboratif",
+            "Install Fest, Ngoprek Linux, Workshop Command Line, Kontribusi Open Source",
+            "CTF Competitions, Security Workshop, Penetration Testing",
+            "Web Development Workshop, UI/UX Challenge, Frontend Bootcamp",
+            "Mobile App Development, Camera Tech Workshop, AR/VR Exploration",
+            "Robot Building, IoT Projects, Automation Challenge",
+            "Java Coding Camp, Object-Oriented Programming Workshop, Enterprise App Development",
+            "Linux Installation Party, System Administration Workshop, OS Development",
+            "Multimedia Production, Digital Art Workshop, Video Editing Challenge"
+        ],
+        "teknologi": [
+            "Android, Flutter, Firebase, Web, Cloud",
+            "Python, R, TensorFlow, Pandas, Jupyter, SQL",
+            "Ubuntu, Fedora, Git, Command Line, Shell Script",
+            "Kali Linux, Metasploit, Wireshark, OWASP Tools",
+            "HTML/CSS, JavaScript, React, Angular, Vue.js",
+            "Swift, Kotlin, React Native, Flutter, AR Kit",
+            "Arduino, Raspberry Pi, Sensors, Automation Tools",
+            "Java, Spring, Hibernate, Maven, JUnit",
+            "Ubuntu, Linux Kernel, Bash, System Administration Tools",
+            "Adobe Creative Suite, Blender, DaVinci Resolve, GIMP"
+        ],
+        "visi_misi": [
+            "Membangun komunitas teknologi yang inklusif dan memberdayakan mahasiswa dalam pengembangan aplikasi",
+            "Mengembangkan keterampilan data science dan menciptakan solusi berbasis data untuk masalah di sekitar",
+            "Memperkenalkan dan mempromosikan penggunaan perangkat lunak bebas dan sumber terbuka",
+            "Meningkatkan kesadaran dan keterampilan keamanan siber untuk keamanan digital",
+            "Mengembangkan kemampuan pembuatan web yang menarik dan interaktif",
+            "Mendorong inovasi dalam pengembangan aplikasi mobile dan teknologi capture",
+            "Memajukan pengetahuan di bidang robotika dan otomasi untuk solusi masa depan",
+            "Memperdalam pemahaman pemrograman Java dan pengembangan aplikasi enterprise",
+            "Mempromosikan dan mengembangkan ekosistem Linux/Ubuntu di kalangan mahasiswa",
+            "Mengeksplorasi kreativitas melalui teknologi multimedia dan desain"
+        ],
+        "kategori": [
+            "Teknologi", 
+            "Data Science", 
+            "Teknologi",
+            "Keamanan",
+            "Web",
+            "Mobile",
+            "Robotika",
+            "Pemrograman",
+            "Sistem Operasi",
+            "Multimedia"
+        ]
+    })
+    
+    # Buat kolom konten komunitas
+    df_komunitas["konten_komunitas"] = join_text_columns(
+        df_komunitas, ["nama_komunitas", "deskripsi", "aktivitas", "teknologi", "visi_misi"]
+    )
+    
+    return df_komunitas
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_komunitas_cards(komunitas_info):
+    """
+    Membuat HTML card untuk setiap komunitas (sekali, bukan setiap rerun form)
+    """
+    cards = {}
+    for komunitas, info in komunitas_info.items():
+        cards[komunitas] = f"""
+<div class="komunitas-card" style="border-left: 5px solid {info['color']};">
+    <div class="komunitas-icon">{info['icon']}</div>
+    <div class="komunitas-header">{komunitas}</div>
+    <div class="komunitas-desc">{info['desc']}</div>
+</div>
+"""
+    return cards
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_cbf(konten_komunitas):
+    """
+    Fit TF-IDF pada konten komunitas (di-cache agar tidak di-fit ulang setiap rerun)
+    """
+    # norm="l2": setiap baris TF-IDF sudah ter-normalisasi, sehingga cosine similarity = dot product
+    tfidf = TfidfVectorizer(norm="l2", dtype=np.float32)
+    tfidf_kom = tfidf.fit_transform(konten_komunitas)
+    return tfidf, tfidf_kom
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def compute_cbf_scores(profil_mahasiswa, konten_komunitas):
+    """
+    Menghitung cosine similarity antara profil mahasiswa dan konten komunitas
+    """
+    tfidf, tfidf_kom = build_cbf(konten_komunitas)
+
+    # Profil yang sama cukup di-transform sekali, lalu disebar kembali ke setiap baris
+    codes, unique_profil = pd.factorize(pd.Series(profil_mahasiswa, dtype=object))
+    tfidf_mhs = tfidf.transform(unique_profil)
+
+    # Baris TF-IDF sudah ter-normalisasi L2, jadi cukup sparse x sparse matmul (dense hanya di hasil akhir)
+    return (tfidf_mhs @ tfidf_kom.T).toarray()[codes]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def compute_user_sim(rating_values):
+    """
+    Menghitung cosine similarity antar mahasiswa berdasarkan rating matrix
+    """
+    # Normalisasi L2 per baris sekali, lalu cosine similarity = satu matmul (tetap float32)
+    norms = np.linalg.norm(rating_values, axis=1, keepdims=True)
+    rating_norm = csr_if_sparse(rating_values / (norms + 1e-12))
+    user_sim = rating_norm @ rating_norm.T
+    return user_sim.toarray() if hasattr(user_sim, "toarray") else user_sim
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def to_csv_bytes(df):
+    """
+    Serialisasi DataFrame ke CSV (bytes) untuk tombol download, di-cache selama data tidak berubah
+    """
+    return df.to_csv(index=False).encode("utf-8")
+
+# ======================================================
+# DEBUG / DETAIL PERHITUNGAN
+# ======================================================
+
+def render_cbf_input_debug(df_mahasiswa, df_komunitas):
+    """
+    Menampilkan sample profil mahasiswa dan konten komunitas yang menjadi input CBF
+    """
+    with st.expander("Data Input untuk CBF"):
+        st.write("**Profil Mahasiswa (Sample):**")
+        st.dataframe(df_mahasiswa[["nama_mahasiswa", "profil_mahasiswa"]].head())
+        
+        st.write("**Profil Komunitas (Sample):**")
+        st.dataframe(df_komunitas[["nama_komunitas", "konten_komunitas"]].head())
+
+def render_cbf_debug(tfidf, tfidf_kom, cbf_scores, df_mahasiswa, df_komunitas):
+    """
+    Menampilkan detail TF-IDF dan skor CBF (sample + heatmap)
+    """
+    with st.expander("Detail TF-IDF dan Similarity"):
+        feat_names = tfidf.get_feature_names_out()
+        st.write(f"Jumlah fitur TF-IDF: {len(feat_names)}")
+        
+        # Tampilkan sample TF-IDF matrix (hanya 5 kolom pertama yang di-densify)
+        tfidf_df_kom = pd.DataFrame(
+            tfidf_kom[:, :5].toarray(), 
+            columns=feat_names[:5],
+            index=df_komunitas["nama_komunitas"]
+        )
+        st.write("**Sample TF-IDF Matrix Komunitas (5 fitur pertama):**")
+        st.dataframe(tfidf_df_kom)
+        
+        # Visualize CBF scores
+        cbf_df = pd.DataFrame(
+            cbf_scores, 
+            columns=df_komunitas["nama_komunitas"],
+            index=df_mahasiswa["nama_mahasiswa"]
+        )
+        st.write("**Sample CBF Scores (5 mahasiswa pertama, semua komunitas):**")
+        st.dataframe(cbf_df.head())
+        
+        # Visualize as heatmap
+        st.write("**Heatmap CBF Scores (5 mahasiswa pertama):**")
+        show_heatmap(cbf_df.head())
+
+def render_rating_stats_debug(df_mahasiswa, original_rating_cols):
+    """
+    Menampilkan kolom rating yang ditemukan beserta statistiknya
+    """
+    with st.expander("Statistik Rating"):
+        st.write("**Kolom Rating yang Ditemukan:**")
+        st.write(original_rating_cols)
+        
+        if len(original_rating_cols) > 0:
+            rating_stats = df_mahasiswa[original_rating_cols].describe().T
+            rating_stats['non_zero_count'] = df_mahasiswa[original_rating_cols].astype(bool).sum()
+            rating_stats['non_zero_percentage'] = (rating_stats['non_zero_count'] / len(df_mahasiswa) * 100).round(2)
+            st.write("**Statistik Rating:**")
+            st.dataframe(rating_stats)
+        else:
+            st.warning("Tidak ada kolom rating yang ditemukan.")
+
+def render_rating_standardization_debug(df_mahasiswa, standardized_rating_cols):
+    """
+    Menampilkan kolom rating hasil standardisasi
+    """
+    with st.expander("Detail Standardisasi Rating"):
+        st.write("**Standardized Rating Columns:**")
+        st.write(standardized_rating_cols)
+        
+        # Show a sample of the standardized rating data
+        if len(standardized_rating_cols) > 0:
+            sample_ratings = df_mahasiswa[["nama_mahasiswa"] + standardized_rating_cols].head()
+            st.write("**Sample Standardized Ratings (5 mahasiswa pertama):**")
+            st.dataframe(sample_ratings)
+
+def render_rating_matrix_debug(rating_matrix, rating_values):
+    """
+    Menampilkan sample rating matrix dan distribusi rating non-zero
+    """
+    with st.expander("Rating Matrix"):
+        st.write(f"Shape Rating Matrix: {rating_matrix.shape}")
+        st.write("**Sample Rating Matrix (5 mahasiswa pertama):**")
+        st.dataframe(rating_matrix.head())
+        
+        # Visualize rating distribution
+        st.write("**Distribusi Rating:**")
+        fig, ax = plt.subplots(figsize=(10, 6))
+        
+        # Gather all non-zero ratings
+        all_ratings = rating_values.flatten()
+        all_ratings = all_ratings[all_ratings > 0]
+        
+        if len(all_ratings) > 0:
+            sns.histplot(all_ratings, bins=10, ax=ax)
+            ax.set_xlabel("Rating Value")
+            ax.set_ylabel("Frequency")
+            ax.set_title("Distribution of Non-Zero Ratings")
+            st.pyplot(fig)
+        else:
+            st.warning("Tidak ada rating non-zero yang ditemukan.")
+        plt.close(fig)
+
+def render_user_sim_debug(user_sim, df_mahasiswa):
+    """
+    Menampilkan sample user similarity matrix (5x5) beserta heatmap
+    """
+    with st.expander("User Similarity Matrix"):
+        user_sim_df = pd.DataFrame(
+            user_sim, 
+            index=df_mahasiswa["nama_mahasiswa"],
+            columns=df_mahasiswa["nama_mahasiswa"]
+        )
+        st.write("**Sample User Similarity Matrix (5x5):**")
+        st.dataframe(user_sim_df.iloc[:5, :5])
+        
+        # Visualize as heatmap
+        st.write("**Heatmap User Similarity (5x5):**")
+        show_heatmap(user_sim_df.iloc[:5, :5], figsize=(10, 8))
+
+def render_cf_steps_debug(user_sim, denoms, cf_scores, df_mahasiswa, df_komunitas, user_idx=0):
+    """
+    Menampilkan langkah perhitungan CF (weighted sum) untuk satu mahasiswa sampel
+    """
+    # Baris user_sim sejajar dengan urutan baris df_mahasiswa
+    sample_user_cf_steps = {
+        "user": df_mahasiswa["nama_mahasiswa"].iloc[user_idx],
+        "similarity": {nama: sim 
+                      for nama, sim in zip(df_mahasiswa["nama_mahasiswa"], user_sim[user_idx]) if sim > 0},
+        "denominator": denoms[user_idx],
+        "weighted_ratings": dict(zip(df_komunitas["nama_komunitas"].to_numpy(), cf_scores[user_idx]))
+    }
+    
+    with st.expander("Sample CF Calculation Steps"):
+        st.write(f"**User: {sample_user_cf_steps['user']}**")
+        
+        st.write("**Similarity dengan Pengguna Lain:**")
+        sim_df = pd.DataFrame(list(sample_user_cf_steps["similarity"].items()), 
+                          columns=["User", "Similarity"]).sort_values("Similarity", ascending=False)
+        st.dataframe(sim_df)
+        
+        st.write(f"**Denominator (sum of similarities): {sample_user_cf_steps['denominator']:.4f}**")
+        
+        st.write("**Weighted Ratings (Predicted CF Scores):**")
+        cf_pred_df = pd.DataFrame(list(sample_user_cf_steps["weighted_ratings"].items()), 
+                              columns=["Komunitas", "Predicted Score"]).sort_values("Predicted Score", ascending=False)
+        st.dataframe(cf_pred_df)
+
+def render_cf_debug(cf_scores, df_mahasiswa, df_komunitas):
+    """
+    Menampilkan skor CF final (sample + heatmap)
+    """
+    with st.expander("Final CF Scores"):
+        cf_df = pd.DataFrame(
+            cf_scores, 
+            columns=df_komunitas["nama_komunitas"],
+            index=df_mahasiswa["nama_mahasiswa"]
+        )
+        st.write("**Sample CF Scores (5 mahasiswa pertama):**")
+        st.dataframe(cf_df.head())
+        
+        # Visualize as heatmap
+        st.write("**Heatmap CF Scores (5 mahasiswa pertama):**")
+        show_heatmap(cf_df.head())
+
+def render_normalization_debug(cbf_scores, cbf_scores_norm, cf_scores, cf_scores_norm, df_komunitas):
+    """
+    Menampilkan perbandingan skor sebelum dan sesudah normalisasi untuk mahasiswa pertama
+    """
+    with st.expander("Detail Normalisasi"):
+        # For CBF
+        st.write("**CBF Scores:**")
+        cbf_norm_sample = pd.DataFrame({
+            "Original": cbf_scores[0, :5],
+            "Normalized": cbf_scores_norm[0, :5]
+        }, index=df_komunitas["nama_komunitas"][:5])
+        st.dataframe(cbf_norm_sample)
+        
+        # For CF
+        st.write("**CF Scores:**")
+        cf_norm_sample = pd.DataFrame({
+            "Original": cf_scores[0, :5],
+            "Normalized": cf_scores_norm[0, :5]
+        }, index=df_komunitas["nama_komunitas"][:5])
+        st.dataframe(cf_norm_sample)
+
+def render_hybrid_debug(cbf_scores_norm, cf_scores_norm, hybrid_scores, df_komunitas, hybrid_method, alpha):
+    """
+    Menampilkan contoh perhitungan skor hybrid dan kontribusi CBF/CF untuk mahasiswa pertama
+    """
+    with st.expander("Detail Hybrid Calculation"):
+        method_name = "Weighted Average" if hybrid_method == "Weighted Average (Pembobotan)" else "Simple Average"
+        
+        st.write(f"**Sample {method_name} Calculation**")
+        if hybrid_method == "Weighted Average (Pembobotan)":
+            hybrid_calc_sample = pd.DataFrame({
+                "CBF (Normalized)": cbf_scores_norm[0, :5],
+                "CF (Normalized)": cf_scores_norm[0, :5],
+                f"α × CBF": alpha * cbf_scores_norm[0, :5],
+                f"(1-α) × CF": (1 - alpha) * cf_scores_norm[0, :5],
+                f"Hybrid (α={alpha})": hybrid_scores[0, :5]
+            }, index=df_komunitas["nama_komunitas"][:5])
+        else:  # Simple Average
+            hybrid_calc_sample = pd.DataFrame({
+                "CBF (Normalized)": cbf_scores_norm[0, :5],
+                "CF (Normalized)": cf_scores_norm[0, :5],
+                "CBF + CF": cbf_scores_norm[0, :5] + cf_scores_norm[0, :5],
+                "Hybrid (rata-rata)": hybrid_scores[0, :5]
+            }, index=df_komunitas["nama_komunitas"][:5])
+        
+        st.dataframe(hybrid_calc_sample)
+        
+        # Visualize hybrid composition
+        st.write("**Kontribusi Masing-masing Metode pada Skor Hybrid:**")
+        fig, ax = plt.subplots(figsize=(10, 5))
+        
+        # Get top 5 communities for the sample user
+        top_indices = top_n_indices(hybrid_scores[0], 5)
+        top_communities = df_komunitas["nama_komunitas"].iloc[top_indices].tolist()
+        
+        # Create data for stacked bar chart
+        if hybrid_method == "Weighted Average (Pembobotan)":
+            cbf_contribution = alpha * cbf_scores_norm[0, top_indices]
+            cf_contribution = (1 - alpha) * cf_scores_norm[0, top_indices]
+        else:  # Simple Average
+            cbf_contribution = 0.5 * cbf_scores_norm[0, top_indices]
+            cf_contribution = 0.5 * cf_scores_norm[0, top_indices]
+        
+        # Create the stacked bar chart
+        ax.bar(top_communities, cbf_contribution, label='CBF Contribution')
+        ax.bar(top_communities, cf_contribution, bottom=cbf_contribution, label='CF Contribution')
+        
+        ax.set_ylabel('Score Contribution')
+        ax.set_title(f'Hybrid Score Composition ({method_name})')
+        ax.legend()
+        
+        # Rotate labels for better readability
+        plt.xticks(rotation=45, ha='right')
+        plt.tight_layout()
+        
+        st.pyplot(fig)
+        plt.close(fig)
 
 # ======================================================
 # APP CONFIGURATION
@@ -320,6 +794,9 @@ elif input_mode == "Input Manual":
     "UINBUNTU": {"desc": "Komunitas Ubuntu dan Linux", "icon": "💿", "color": "#FF6347"},
     "MAMUD": {"desc": "Komunitas Manusia Multimedia", "icon": "🎨", "color": "#32CD32"}
     }
+    
+# Info komunitas dalam bentuk tabel, urutan baris mengikuti default_komunitas
+    komunitas_info_df = pd.DataFrame.from_dict(komunitas_info, orient="index").reindex(default_komunitas)
 
 # CSS untuk card style
     st.markdown("""
@@ -377,6 +854,7 @@ elif input_mode == "Input Manual":
         row2_kom = default_komunitas[5:]  # 5 komunitas terakhir
     
         rating_cols = {}
+        komunitas_cards = build_komunitas_cards(komunitas_info)
     
     # Baris 1 komunitas
         st.markdown("#### Baris 1")
@@ -384,17 +862,7 @@ elif input_mode == "Input Manual":
         for i, komunitas in enumerate(row1_kom):
             with cols1[i]:
             # Card style dengan HTML
-                color = komunitas_info[komunitas]["color"]
-                icon = komunitas_info[komunitas]["icon"]
-                desc = komunitas_info[komunitas]["desc"]
-            
-                st.markdown(f"""
-                <div class="komunitas-card" style="border-left: 5px solid {color};">
-                    <div class="komunitas-icon">{icon}</div>
-                    <div class="komunitas-header">{komunitas}</div>
-                    <div class="komunitas-desc">{desc}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(komunitas_cards[komunitas], unsafe_allow_html=True)
             
                 rating_cols[komunitas] = st.slider(
                  label=f"Rating {komunitas}", 
@@ -411,17 +879,7 @@ elif input_mode == "Input Manual":
         for i, komunitas in enumerate(row2_kom):
             with cols2[i]:
             # Card style dengan HTML
-                color = komunitas_info[komunitas]["color"]
-                icon = komunitas_info[komunitas]["icon"]
-                desc = komunitas_info[komunitas]["desc"]
-            
-                st.markdown(f"""
-                <div class="komunitas-card" style="border-left: 5px solid {color};">
-                    <div class="komunitas-icon">{icon}</div>
-                    <div class="komunitas-header">{komunitas}</div>
-                    <div class="komunitas-desc">{desc}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(komunitas_cards[komunitas], unsafe_allow_html=True)
             
                 rating_cols[komunitas] = st.slider(
                     label=f"Rating {komunitas}", 
@@ -439,7 +897,7 @@ elif input_mode == "Input Manual":
             submitted = st.form_submit_button("💾 Simpan Data", use_container_width=True)
 
 # Jika form disubmit
-    if submitted and 'nama_mhs' in locals() and nama_mhs:
+    if submitted and nama_mhs:
         profil_mahasiswa = f"{passion} {pengetahuan} {tim} {skill} {motivasi}"
     
     # Membuat dataframe mahasiswa
@@ -455,12 +913,15 @@ elif input_mode == "Input Manual":
             "motivasi": [motivasi]
         }
     
-    # Menambahkan data rating ke dataframe
+    # Menambahkan data rating ke dataframe (format sama dengan data CSV)
         for kom, rating in rating_cols.items():
             mahasiswa_data[f"Rating [{kom}]"] = [rating]
     
         df_mahasiswa = pd.DataFrame(mahasiswa_data)
     
+    # DataFrame komunitas default
+        df_komunitas = default_komunitas_df(tuple(default_komunitas)).copy()
+    
     # Tampilkan ringkasan data
         st.success(f"✅ Data untuk {nama_mhs} berhasil diinput!")
     
@@ -468,20 +929,19 @@ elif input_mode == "Input Manual":
         st.subheader("📊 Ringkasan Rating")
     
         rating_data = {
-            'Komunitas': list(rating_cols.keys()),
+            'Komunitas': pd.Categorical(list(rating_cols.keys()), categories=default_komunitas),
             'Rating': list(rating_cols.values())
         }
         rating_df = pd.DataFrame(rating_data)
-        rating_df = rating_df.sort_values('Rating', ascending=False)
     
     # Hanya tampilkan komunitas dengan rating > 0
-        non_zero_ratings = rating_df[rating_df['Rating'] > 0]
+        non_zero_ratings = rating_df[rating_df['Rating'] > 0].sort_values('Rating', ascending=False)
     
         if len(non_zero_ratings) > 0:
         # Plot bar chart
             fig, ax = plt.subplots(figsize=(10, 5))
             bars = ax.barh(non_zero_ratings['Komunitas'], non_zero_ratings['Rating'], 
-                    color=[komunitas_info[k]['color'] for k in non_zero_ratings['Komunitas']])
+                    color=komunitas_info_df['color'].to_numpy()[non_zero_ratings['Komunitas'].cat.codes])
         
             ax.set_xlabel('Rating')
             ax.set_title('Rating Komunitas')
@@ -493,144 +953,23 @@ elif input_mode == "Input Manual":
                 ax.text(width + 0.1, bar.get_y() + bar.get_height()/2, f'{width:.1f}', 
                         ha='left', va='center')
         
-            st.pyplot(fig)
+            st.pyplot(fig, clear_figure=True)
+            plt.close(fig)
         else:
             st.info("Belum ada rating yang diberikan untuk komunitas manapun.")
     
-    # Jika form disubmit dan ada nama mahasiswa
-        if submitted and nama_mhs:
-        # Gabungkan profil mahasiswa
-            profil_mahasiswa = f"{passion} {pengetahuan} {tim} {skill} {motivasi}"
-        
-        # Siapkan data mahasiswa termasuk rating
-            mahasiswa_data = {
-                "Mahasiswa": [nama_mhs],
-                "nama_mahasiswa": [nama_mhs],
-                "id_mahasiswa": ["MHS_1"],
-                "profil_mahasiswa": [profil_mahasiswa],
-                "passion": [passion],
-                "pengetahuan_sebelumnya": [pengetahuan],
-                "tim": [tim],
-                "skill": [skill],
-                "motivasi": [motivasi]
-            }
-        
-        # Tambahkan kolom rating dengan format yang sesuai dengan data CSV
-            for komunitas, rating in rating_cols.items():
-                rating_col_name = f"Rating [{komunitas}]"
-                mahasiswa_data[rating_col_name] = [rating]
-        
-        # Buat DataFrame mahasiswa
-            df_mahasiswa = pd.DataFrame(mahasiswa_data)
-        
-        # Buat DataFrame komunitas default
-            # Buat DataFrame komunitas default
-            df_komunitas = pd.DataFrame({
-                "id_komunitas": default_komunitas,
-                "nama_komunitas": default_komunitas,
-                "deskripsi": [
-                    "Google Developer Student Clubs - Komunitas pengembang yang didukung Google untuk mahasiswa",
-                    "Data Science Enthusiast - Komunitas untuk para penggemar ilmu data dan analitik",
-                    "UINUX - Komunitas pengguna dan pengembang Linux dan perangkat lunak sumber terbuka",
-                    "ETH0 - Komunitas keamanan siber dan ethical hacking",
-                    "WEBONDER - Komunitas pengembangan web dan UI/UX",
-                    "MOCAP - Komunitas pengembangan aplikasi mobile dan teknologi capture",
-                    "ONTAKI - Komunitas robotika dan teknologi otomasi",
-                    "FUN JAVA - Komunitas pemrograman Java dan pengembangan aplikasi",
-                    "UINBUNTU - Komunitas Ubuntu dan pengembangan sistem operasi Linux",
-                    "MAMUD - Komunitas multimedia dan desain digital"
-                ],
-                "aktivitas": [
-                    "Workshop, Hackathon, Study Jam, Webinar",
-                    "Bootcamp, Datathon, Pelatihan, Proyek Kolaboratif",
-                    "Install Fest, Ngoprek Linux, Workshop Command Line, Kontribusi Open Source",
-                    "CTF Competitions, Security Workshop, Penetration Testing",
-                    "Web Development Workshop, UI/UX Challenge, Frontend Bootcamp",
-                    "Mobile App Development, Camera Tech Workshop, AR/VR Exploration",
-                    "Robot Building, IoT Projects, Automation Challenge",
-                    "Java Coding Camp, Object-Oriented Programming Workshop, Enterprise App Development",
-                    "Linux Installation Party, System Administration Workshop, OS Development",
-                    "Multimedia Production, Digital Art Workshop, Video Editing Challenge"
-                ],
-                "teknologi": [
-                    "Android, Flutter, Firebase, Web, Cloud",
-                    "Python, R, TensorFlow, Pandas, Jupyter, SQL",
-                    "Ubuntu, Fedora, Git, Command Line, Shell Script",
-                    "Kali Linux, Metasploit, Wireshark, OWASP Tools",
-                    "HTML/CSS, JavaScript, React, Angular, Vue.js",
-                    "Swift, Kotlin, React Native, Flutter, AR Kit",
-                    "Arduino, Raspberry Pi, Sensors, Automation Tools",
-                    "Java, Spring, Hibernate, Maven, JUnit",
-                    "Ubuntu, Linux Kernel, Bash, System Administration Tools",
-                    "Adobe Creative Suite, Blender, DaVinci Resolve, GIMP"
-                ],
-                "visi_misi": [
-                    "Membangun komunitas teknologi yang inklusif dan memberdayakan mahasiswa dalam pengembangan aplikasi",
-                    "Mengembangkan keterampilan data science dan menciptakan solusi berbasis data untuk masalah di sekitar",
-                    "Memperkenalkan dan mempromosikan penggunaan perangkat lunak bebas dan sumber terbuka",
-                    "Meningkatkan kesadaran dan keterampilan keamanan siber untuk keamanan digital",
-                    "Mengembangkan kemampuan pembuatan web yang menarik dan interaktif",
-                    "Mendorong inovasi dalam pengembangan aplikasi mobile dan teknologi capture",
-                    "Memajukan pengetahuan di bidang robotika dan otomasi untuk solusi masa depan",
-                    "Memperdalam pemahaman pemrograman Java dan pengembangan aplikasi enterprise",
-                    "Mempromosikan dan mengembangkan ekosistem Linux/Ubuntu di kalangan mahasiswa",
-                    "Mengeksplorasi kreativitas melalui teknologi multimedia dan desain"
-                ],
-                "kategori": [
-                    "Teknologi", 
-                    "Data Science", 
-                    "Teknologi",
-                    "Keamanan",
-                    "Web",
-                    "Mobile",
-                    "Robotika",
-                    "Pemrograman",
-                    "Sistem Operasi",
-                    "Multimedia"
-                ]
-            })
-        
-        # Buat kolom konten komunitas
-            df_komunitas["konten_komunitas"] = df_komunitas[
-                ["nama_komunitas", "deskripsi", "aktivitas", "teknologi", "visi_misi"]
-            ].fillna("").agg(" ".join, axis=1)
-        
-        # Tampilkan preview data yang diinput
-            st.success(f"Data untuk {nama_mhs} berhasil diinput!")
-        
-            with st.expander("Detail Data yang Diinput"):
-                col1, col2 = st.columns(2)
-            
-                with col1:
-                    st.write("**Profil Mahasiswa:**")
-                    st.dataframe(df_mahasiswa[["nama_mahasiswa", "profil_mahasiswa"]])
-            
-                with col2:
-                    st.write("**Rating yang Diberikan:**")
-                # Buat DataFrame untuk tampilan rating
-                    rating_data = {
-                        'Komunitas': list(rating_cols.keys()),
-                        'Rating': list(rating_cols.values())
-                    }
-                    rating_df = pd.DataFrame(rating_data)
-                
-                # Tampilkan rating dalam tabel
-                    st.dataframe(rating_df)
-                
-                # Tambahkan visualisasi bar chart untuk rating
-                    if any(rating > 0 for rating in rating_cols.values()):
-                        fig, ax = plt.subplots(figsize=(8, 3))
-                        sns.barplot(
-                            x='Komunitas', 
-                            y='Rating', 
-                            data=rating_df,
-                            palette='viridis',
-                            ax=ax
-                        )
-                        ax.set_title(f'Rating dari {nama_mhs}')
-                        ax.set_ylim(0, 5)
-                        plt.tight_layout()
-                        st.pyplot(fig)
+    # Tampilkan preview data yang diinput
+        with st.expander("Detail Data yang Diinput"):
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                st.write("**Profil Mahasiswa:**")
+                st.dataframe(df_mahasiswa[["nama_mahasiswa", "profil_mahasiswa"]])
+        
+            with col2:
+                st.write("**Rating yang Diberikan:**")
+            # Tampilkan rating dalam tabel (grafiknya sudah ada di Ringkasan Rating)
+                st.dataframe(rating_df)
 
 # ======================================================
 # RECOMMENDATION SYSTEM ALGORITHM
@@ -646,50 +985,19 @@ if df_mahasiswa is not None and df_komunitas is not None:
         
         # Tampilkan informasi input jika diminta
         if show_calc_steps:
-            with st.expander("Data Input untuk CBF"):
-                st.write("**Profil Mahasiswa (Sample):**")
-                st.dataframe(df_mahasiswa[["nama_mahasiswa", "profil_mahasiswa"]].head())
-                
-                st.write("**Profil Komunitas (Sample):**")
-                st.dataframe(df_komunitas[["nama_komunitas", "konten_komunitas"]].head())
+            render_cbf_input_debug(df_mahasiswa, df_komunitas)
         
         # TF-IDF dan perhitungan similarity
         with st.spinner("Menghitung TF-IDF dan similarity..."):
-            tfidf = TfidfVectorizer()
-            tfidf_kom = tfidf.fit_transform(df_komunitas["konten_komunitas"])
-            tfidf_mhs = tfidf.transform(df_mahasiswa["profil_mahasiswa"])
-            cbf_scores = cosine_similarity(tfidf_mhs, tfidf_kom)
+            konten_komunitas = tuple(df_komunitas["konten_komunitas"])
+            tfidf, tfidf_kom = build_cbf(konten_komunitas)
+            cbf_scores = compute_cbf_scores(tuple(df_mahasiswa["profil_mahasiswa"]), konten_komunitas)
         
         st.success("✅ Perhitungan Content-Based Filtering selesai!")
         
         # Tampilkan detail TF-IDF jika diminta
         if show_calc_steps:
-            with st.expander("Detail TF-IDF dan Similarity"):
-                st.write(f"Jumlah fitur TF-IDF: {len(tfidf.get_feature_names_out())}")
-                
-                # Tampilkan sample TF-IDF matrix
-                tfidf_df_kom = pd.DataFrame(
-                    tfidf_kom.toarray(), 
-                    columns=tfidf.get_feature_names_out(),
-                    index=df_komunitas["nama_komunitas"]
-                )
-                st.write("**Sample TF-IDF Matrix Komunitas (5 fitur pertama):**")
-                st.dataframe(tfidf_df_kom.iloc[:, :5])
-                
-                # Visualize CBF scores
-                cbf_df = pd.DataFrame(
-                    cbf_scores, 
-                    columns=df_komunitas["nama_komunitas"],
-                    index=df_mahasiswa["nama_mahasiswa"]
-                )
-                st.write("**Sample CBF Scores (5 mahasiswa pertama, semua komunitas):**")
-                st.dataframe(cbf_df.head())
-                
-                # Visualize as heatmap
-                st.write("**Heatmap CBF Scores (5 mahasiswa pertama):**")
-                fig, ax = plt.subplots(figsize=(10, 5))
-                sns.heatmap(cbf_df.head(), annot=True, cmap="YlGnBu", ax=ax)
-                st.pyplot(fig)
+            render_cbf_debug(tfidf, tfidf_kom, cbf_scores, df_mahasiswa, df_komunitas)
         
         # === 2. COLLABORATIVE FILTERING (CF) ===
         st.subheader("2️⃣ Collaborative Filtering (CF)")
@@ -699,226 +1007,93 @@ if df_mahasiswa is not None and df_komunitas is not None:
         
         # Tampilkan statistik rating jika diminta
         if show_calc_steps:
-            with st.expander("Statistik Rating"):
-                st.write("**Kolom Rating yang Ditemukan:**")
-                st.write(original_rating_cols)
-                
-                if len(original_rating_cols) > 0:
-                    rating_stats = df_mahasiswa[original_rating_cols].describe().T
-                    rating_stats['non_zero_count'] = df_mahasiswa[original_rating_cols].astype(bool).sum()
-                    rating_stats['non_zero_percentage'] = (rating_stats['non_zero_count'] / len(df_mahasiswa) * 100).round(2)
-                    st.write("**Statistik Rating:**")
-                    st.dataframe(rating_stats)
-                else:
-                    st.warning("Tidak ada kolom rating yang ditemukan.")
+            render_rating_stats_debug(df_mahasiswa, original_rating_cols)
         
         # Standardisasi kolom rating
         with st.spinner("Standardisasi kolom rating..."):
-            df_mahasiswa, df_komunitas, standardized_rating_cols = standardize_rating_columns(
+            df_mahasiswa, df_komunitas, standardized_rating_cols, rating_values = standardize_rating_columns(
                 df_mahasiswa, df_komunitas, original_rating_cols
             )
         
         # Tampilkan detail standardisasi rating jika diminta
         if show_calc_steps:
-            with st.expander("Detail Standardisasi Rating"):
-                st.write("**Standardized Rating Columns:**")
-                st.write(standardized_rating_cols)
-                
-                # Show a sample of the standardized rating data
-                if len(standardized_rating_cols) > 0:
-                    sample_ratings = df_mahasiswa[["nama_mahasiswa"] + standardized_rating_cols].head()
-                    st.write("**Sample Standardized Ratings (5 mahasiswa pertama):**")
-                    st.dataframe(sample_ratings)
+            render_rating_standardization_debug(df_mahasiswa, standardized_rating_cols)
         
         # Buat rating matrix
-        rating_matrix = df_mahasiswa[standardized_rating_cols].copy() if standardized_rating_cols else pd.DataFrame()
-        if not rating_matrix.empty:
-            rating_matrix.index = df_mahasiswa["id_mahasiswa"]
-            rating_matrix = rating_matrix.fillna(0).astype(float)
+        kom_ids = df_komunitas["id_komunitas"].tolist()
+        if rating_values.size > 0:
+            rating_matrix = pd.DataFrame(
+                rating_values,
+                index=df_mahasiswa["id_mahasiswa"],
+                columns=[f"Rating_{kom_id}" for kom_id in kom_ids]
+            )
             
             # Tampilkan rating matrix jika diminta
             if show_calc_steps:
-                with st.expander("Rating Matrix"):
-                    st.write(f"Shape Rating Matrix: {rating_matrix.shape}")
-                    st.write("**Sample Rating Matrix (5 mahasiswa pertama):**")
-                    st.dataframe(rating_matrix.head())
-                    
-                    # Visualize rating distribution
-                    st.write("**Distribusi Rating:**")
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    
-                    # Gather all non-zero ratings
-                    all_ratings = rating_matrix.values.flatten()
-                    all_ratings = all_ratings[all_ratings > 0]
-                    
-                    if len(all_ratings) > 0:
-                        sns.histplot(all_ratings, bins=10, ax=ax)
-                        ax.set_xlabel("Rating Value")
-                        ax.set_ylabel("Frequency")
-                        ax.set_title("Distribution of Non-Zero Ratings")
-                        st.pyplot(fig)
-                    else:
-                        st.warning("Tidak ada rating non-zero yang ditemukan.")
+                render_rating_matrix_debug(rating_matrix, rating_values)
             
             # Hitung similarity antar mahasiswa
             with st.spinner("Menghitung similarity antar mahasiswa..."):
                 # Inisialisasi CF scores dengan ukuran yang sama dengan CBF scores
-                cf_scores = np.zeros_like(cbf_scores)
+                cf_scores = np.zeros_like(cbf_scores, dtype=np.float32)
                 
                 # Hitung user similarity jika ada minimal 2 mahasiswa
                 if len(df_mahasiswa) > 1:
-                    user_sim = cosine_similarity(rating_matrix)
+                    user_sim = compute_user_sim(rating_values)
                     
                     # Tampilkan user similarity jika diminta
                     if show_calc_steps:
-                        with st.expander("User Similarity Matrix"):
-                            user_sim_df = pd.DataFrame(
-                                user_sim, 
-                                index=df_mahasiswa["nama_mahasiswa"],
-                                columns=df_mahasiswa["nama_mahasiswa"]
-                            )
-                            st.write("**Sample User Similarity Matrix (5x5):**")
-                            st.dataframe(user_sim_df.iloc[:5, :5])
-                            
-                            # Visualize as heatmap
-                            st.write("**Heatmap User Similarity (5x5):**")
-                            fig, ax = plt.subplots(figsize=(10, 8))
-                            sns.heatmap(user_sim_df.iloc[:5, :5], annot=True, cmap="YlGnBu", ax=ax)
-                            st.pyplot(fig)
+                        render_user_sim_debug(user_sim, df_mahasiswa)
                     
-                    # Prediksi rating menggunakan weighted sum algorithm
-                    sample_user_idx = 0
-                    sample_user_cf_steps = None
+                    # Prediksi rating menggunakan weighted sum algorithm (semua mahasiswa sekaligus)
+                    # Exclude self similarity langsung di tempat (cache_data mengembalikan salinan baru)
+                    np.fill_diagonal(user_sim, 0)
+                    denoms = user_sim.sum(axis=1) + 1e-6  # Avoid division by zero
                     
-                    kom_ids = df_komunitas["id_komunitas"].tolist()
+                    # Matrix multiplication untuk weighted sum algorithm
+                    # Kolom rating_values sudah sejajar dengan urutan komunitas
+                    # Rating matrix yang jarang (density < 20%) dikalikan dalam format CSR
+                    cf_scores[:] = (user_sim @ csr_if_sparse(rating_values)) / denoms[:, None]
                     
-                    for i, user in enumerate(rating_matrix.index):
-                        sims = user_sim[i].copy()
-                        sims[i] = 0  # Exclude self similarity
-                        denom = sims.sum() + 1e-6  # Avoid division by zero
-                        
-                        # Matrix multiplication untuk weighted sum algorithm
-                        weighted_ratings = sims @ rating_matrix.values
-                        cf_scores_user = weighted_ratings / denom
-                        
-                        # Map these scores back to our komunitas indices
-                        for j, kom_id in enumerate(kom_ids):
-                            std_col = f"Rating_{kom_id}"
-                            if std_col in standardized_rating_cols:
-                                col_idx = standardized_rating_cols.index(std_col)
-                                cf_scores[i, j] = cf_scores_user[col_idx]
-                        
-                        # Track calculation steps for a sample user
-                        if i == sample_user_idx and show_calc_steps:
-                            sample_user_name = df_mahasiswa.loc[df_mahasiswa["id_mahasiswa"] == user, "nama_mahasiswa"].iloc[0]
-                            sample_user_cf_steps = {
-                                "user": sample_user_name,
-                                "similarity": {df_mahasiswa.loc[df_mahasiswa["id_mahasiswa"] == idx, "nama_mahasiswa"].iloc[0]: sim 
-                                              for idx, sim in zip(rating_matrix.index, sims) if sim > 0},
-                                "denominator": denom,
-                                "weighted_ratings": {df_komunitas.iloc[j]["nama_komunitas"]: cf_scores[i, j] 
-                                                   for j in range(len(df_komunitas))}
-                            }
                 else:
                     # Untuk input manual 1 mahasiswa - gunakan rating asli sebagai CF scores
                     st.info("Mode input manual dengan satu mahasiswa. CF akan menggunakan rating yang Anda berikan.")
                     
                     # Normalisasi rating untuk CF scores (0-5 menjadi 0-1)
-                    for i, user in enumerate(df_mahasiswa["id_mahasiswa"]):
-                        for j, kom_id in enumerate(df_komunitas["id_komunitas"]):
-                            # Cari rating kolom yang sesuai dengan komunitas
-                            for col in original_rating_cols:
-                                if kom_id in col:
-                                    # Normalisasi nilai rating (dari 0-5 menjadi 0-1)
-                                    rating_val = df_mahasiswa.iloc[i][col] / 5.0
-                                    cf_scores[i, j] = rating_val
+                    # Kolom rating_values sudah sejajar dengan urutan komunitas
+                    cf_scores[:] = rating_values / 5.0
             
             st.success("✅ Perhitungan Collaborative Filtering selesai!")
             
             # Tampilkan sample calculation jika diminta
-            if show_calc_steps and 'sample_user_cf_steps' in locals() and sample_user_cf_steps:
-                with st.expander("Sample CF Calculation Steps"):
-                    st.write(f"**User: {sample_user_cf_steps['user']}**")
-                    
-                    st.write("**Similarity dengan Pengguna Lain:**")
-                    sim_df = pd.DataFrame(list(sample_user_cf_steps["similarity"].items()), 
-                                      columns=["User", "Similarity"]).sort_values("Similarity", ascending=False)
-                    st.dataframe(sim_df)
-                    
-                    st.write(f"**Denominator (sum of similarities): {sample_user_cf_steps['denominator']:.4f}**")
-                    
-                    st.write("**Weighted Ratings (Predicted CF Scores):**")
-                    cf_pred_df = pd.DataFrame(list(sample_user_cf_steps["weighted_ratings"].items()), 
-                                          columns=["Komunitas", "Predicted Score"]).sort_values("Predicted Score", ascending=False)
-                    st.dataframe(cf_pred_df)
+            if show_calc_steps and len(df_mahasiswa) > 1:
+                render_cf_steps_debug(user_sim, denoms, cf_scores, df_mahasiswa, df_komunitas)
             
             # Visualize CF scores if requested
             if show_calc_steps:
-                with st.expander("Final CF Scores"):
-                    cf_df = pd.DataFrame(
-                        cf_scores, 
-                        columns=df_komunitas["nama_komunitas"],
-                        index=df_mahasiswa["nama_mahasiswa"]
-                    )
-                    st.write("**Sample CF Scores (5 mahasiswa pertama):**")
-                    st.dataframe(cf_df.head())
-                    
-                    # Visualize as heatmap
-                    st.write("**Heatmap CF Scores (5 mahasiswa pertama):**")
-                    fig, ax = plt.subplots(figsize=(10, 5))
-                    sns.heatmap(cf_df.head(), annot=True, cmap="YlGnBu", ax=ax)
-                    st.pyplot(fig)
+                render_cf_debug(cf_scores, df_mahasiswa, df_komunitas)
         else:
             st.warning("Tidak ada kolom rating yang ditemukan. Collaborative Filtering akan menggunakan nilai 0.")
-            cf_scores = np.zeros_like(cbf_scores)
+            cf_scores = np.zeros_like(cbf_scores, dtype=np.float32)
         
         # === 3. NORMALISASI SCORES ===
         st.subheader("3️⃣ Normalisasi Min-Max Scaling")
         
         with st.spinner("Menormalisasi skor..."):
-            # Check if there are valid scores to normalize
-            cbf_has_nonzero = np.any(cbf_scores != 0)
-            cf_has_nonzero = np.any(cf_scores != 0)
-            
-            # Inisialisasi scaler
-            cbf_scaler = MinMaxScaler()
-            cf_scaler = MinMaxScaler()
+            # Min-max scaling langsung dengan NumPy (tanpa objek MinMaxScaler dan reshape)
+            cbf_scores_norm = minmax_normalize(cbf_scores)
+            cf_scores_norm = minmax_normalize(cf_scores)
             
-            # Reshape untuk scaler (karena MinMaxScaler bekerja pada 2D arrays)
-            if cbf_has_nonzero:
-                cbf_scores_reshaped = cbf_scores.reshape(-1, 1)
-                cbf_scores_norm = cbf_scaler.fit_transform(cbf_scores_reshaped).reshape(cbf_scores.shape)
-            else:
+            if not cbf_scores.any():
                 st.warning("CBF scores are all zero. Skipping normalization for CBF.")
-                cbf_scores_norm = cbf_scores.copy()
-            
-            if cf_has_nonzero:
-                cf_scores_reshaped = cf_scores.reshape(-1, 1)
-                cf_scores_norm = cf_scaler.fit_transform(cf_scores_reshaped).reshape(cf_scores.shape)
-            else:
+            if not cf_scores.any():
                 st.warning("CF scores are all zero. Skipping normalization for CF.")
-                cf_scores_norm = cf_scores.copy()
         
         st.success("✅ Normalisasi skor selesai!")
         
         # Tampilkan detail normalisasi jika diminta
         if show_calc_steps:
-            with st.expander("Detail Normalisasi"):
-                # For CBF
-                st.write("**CBF Scores:**")
-                cbf_norm_sample = pd.DataFrame({
-                    "Original": cbf_scores[0, :5],
-                    "Normalized": cbf_scores_norm[0, :5]
-                }, index=df_komunitas["nama_komunitas"][:5])
-                st.dataframe(cbf_norm_sample)
-                
-                # For CF
-                st.write("**CF Scores:**")
-                cf_norm_sample = pd.DataFrame({
-                    "Original": cf_scores[0, :5],
-                    "Normalized": cf_scores_norm[0, :5]
-                }, index=df_komunitas["nama_komunitas"][:5])
-                st.dataframe(cf_norm_sample)
+            render_normalization_debug(cbf_scores, cbf_scores_norm, cf_scores, cf_scores_norm, df_komunitas)
         
         # === 4. HYBRID SCORE ===
         st.subheader("4️⃣ Hybrid Scoring")
@@ -930,108 +1105,58 @@ if df_mahasiswa is not None and df_komunitas is not None:
             else:  # Simple Average
                 st.write("Menggunakan **Simple Average** (rata-rata sederhana)")
                 hybrid_scores = (cbf_scores_norm + cf_scores_norm) / 2
+            
+            # Pastikan layout row-major float32 untuk pencarian top-N (tanpa salinan jika sudah sesuai)
+            cbf_scores_norm = np.ascontiguousarray(cbf_scores_norm, dtype=np.float32)
+            cf_scores_norm = np.ascontiguousarray(cf_scores_norm, dtype=np.float32)
+            hybrid_scores = np.ascontiguousarray(hybrid_scores, dtype=np.float32)
         
         st.success("✅ Perhitungan skor hybrid selesai!")
         
         # Tampilkan detail hybrid calculation jika diminta
         if show_calc_steps:
-            with st.expander("Detail Hybrid Calculation"):
-                method_name = "Weighted Average" if hybrid_method == "Weighted Average (Pembobotan)" else "Simple Average"
-                
-                st.write(f"**Sample {method_name} Calculation**")
-                if hybrid_method == "Weighted Average (Pembobotan)":
-                    hybrid_calc_sample = pd.DataFrame({
-                        "CBF (Normalized)": cbf_scores_norm[0, :5],
-                        "CF (Normalized)": cf_scores_norm[0, :5],
-                        f"α × CBF": [alpha * score for score in cbf_scores_norm[0, :5]],
-                        f"(1-α) × CF": [(1-alpha) * score for score in cf_scores_norm[0, :5]],
-                        f"Hybrid (α={alpha})": hybrid_scores[0, :5]
-                    }, index=df_komunitas["nama_komunitas"][:5])
-                else:  # Simple Average
-                    hybrid_calc_sample = pd.DataFrame({
-                        "CBF (Normalized)": cbf_scores_norm[0, :5],
-                        "CF (Normalized)": cf_scores_norm[0, :5],
-                        "CBF + CF": [cbf + cf for cbf, cf in zip(cbf_scores_norm[0, :5], cf_scores_norm[0, :5])],
-                        "Hybrid (rata-rata)": hybrid_scores[0, :5]
-                    }, index=df_komunitas["nama_komunitas"][:5])
-                
-                st.dataframe(hybrid_calc_sample)
-                
-                # Visualize hybrid composition
-                st.write("**Kontribusi Masing-masing Metode pada Skor Hybrid:**")
-                fig, ax = plt.subplots(figsize=(10, 5))
-                
-                # Get top 5 communities for the sample user
-                top_indices = np.argsort(hybrid_scores[0, :])[::-1][:5]
-                top_communities = [df_komunitas["nama_komunitas"].iloc[i] for i in top_indices]
-                
-                # Create data for stacked bar chart
-                if hybrid_method == "Weighted Average (Pembobotan)":
-                    cbf_contribution = [alpha * cbf_scores_norm[0, i] for i in top_indices]
-                    cf_contribution = [(1 - alpha) * cf_scores_norm[0, i] for i in top_indices]
-                else:  # Simple Average
-                    cbf_contribution = [0.5 * cbf_scores_norm[0, i] for i in top_indices]
-                    cf_contribution = [0.5 * cf_scores_norm[0, i] for i in top_indices]
-                
-                # Create the stacked bar chart
-                ax.bar(top_communities, cbf_contribution, label='CBF Contribution')
-                ax.bar(top_communities, cf_contribution, bottom=cbf_contribution, label='CF Contribution')
-                
-                ax.set_ylabel('Score Contribution')
-                ax.set_title(f'Hybrid Score Composition ({method_name})')
-                ax.legend()
-                
-                # Rotate labels for better readability
-                plt.xticks(rotation=45, ha='right')
-                plt.tight_layout()
-                
-                st.pyplot(fig)
+            render_hybrid_debug(cbf_scores_norm, cf_scores_norm, hybrid_scores, df_komunitas, hybrid_method, alpha)
         
         # === 5. GENERATE RECOMMENDATIONS ===
         st.subheader("5️⃣ Hasil Rekomendasi")
         
         with st.spinner("Membuat rekomendasi final..."):
-            rekos = []
-            for i, mhs_id in enumerate(df_mahasiswa["id_mahasiswa"]):
-                mhs_name = df_mahasiswa.loc[df_mahasiswa["id_mahasiswa"] == mhs_id, "nama_mahasiswa"].iloc[0]
-                idx_top = np.argsort(hybrid_scores[i])[::-1][:top_n]
-                
-                df_tmp = df_komunitas.iloc[idx_top][["nama_komunitas", "id_komunitas", "kategori"]].copy()
-                df_tmp["Skor_Hybrid"] = hybrid_scores[i][idx_top]
-                df_tmp["Mahasiswa"] = mhs_name
-                
-                # Add detailed scores if requested
-                if show_details:
-                    df_tmp["CBF_Score"] = cbf_scores_norm[i][idx_top]
-                    df_tmp["CF_Score"] = cf_scores_norm[i][idx_top]
-                
-                rekos.append(df_tmp)
+            top_idx = top_n_indices(hybrid_scores, top_n)
+            n_top = top_idx.shape[1]
+            user_row = np.repeat(np.arange(len(df_mahasiswa)), n_top)
+            kom_row = top_idx.ravel()
+            
+            df_rekomendasi = df_komunitas.iloc[kom_row][["nama_komunitas", "id_komunitas", "kategori"]].reset_index(drop=True)
+            df_rekomendasi["Skor_Hybrid"] = hybrid_scores[user_row, kom_row]
+            df_rekomendasi["Mahasiswa"] = df_mahasiswa["nama_mahasiswa"].to_numpy()[user_row]
+            
+            # Add detailed scores if requested
+            if show_details:
+                df_rekomendasi["CBF_Score"] = cbf_scores_norm[user_row, kom_row]
+                df_rekomendasi["CF_Score"] = cf_scores_norm[user_row, kom_row]
         
         # Display results if we have recommendations
-        if rekos:
-            df_rekomendasi = pd.concat(rekos, ignore_index=True)
-            
+        if not df_rekomendasi.empty:
             # Display the recommendation table
-            st.dataframe(df_rekomendasi.style.format({
-                "Skor_Hybrid": "{:.4f}",
-                "CBF_Score": "{:.4f}" if show_details else None,
-                "CF_Score": "{:.4f}" if show_details else None
-            }))
+            score_format = {"Skor_Hybrid": "{:.4f}"}
+            if show_details:
+                score_format.update({"CBF_Score": "{:.4f}", "CF_Score": "{:.4f}"})
+            st.dataframe(df_rekomendasi.style.format(score_format))
             
             # Download button
             st.download_button(
                 "📥 Download Rekomendasi Hybrid", 
-                df_rekomendasi.to_csv(index=False), 
+                to_csv_bytes(df_rekomendasi), 
                 "rekomendasi_hybrid.csv",
                 help="Download rekomendasi dalam format CSV"
             )
             
             # Prepare recommendations dictionary for the detailed display section
             recommendations = {}
+            top5_idx = top_n_indices(hybrid_scores, 5)
             for i, mhs in df_mahasiswa.iterrows():
                 mhs_id = mhs["id_mahasiswa"]
-                idx_top = np.argsort(hybrid_scores[i])[::-1][:5]
-                recommendations[mhs_id] = df_komunitas.iloc[idx_top]["id_komunitas"].tolist()
+                recommendations[mhs_id] = df_komunitas.iloc[top5_idx[i]]["id_komunitas"].tolist()
             
             # === 6. METHOD COMPARISON ===
             st.subheader("6️⃣ Perbandingan Metode Rekomendasi")
@@ -1047,9 +1172,9 @@ if df_mahasiswa is not None and df_komunitas is not None:
                 sample_user_idx = df_mahasiswa[df_mahasiswa["nama_mahasiswa"] == sample_user].index[0]
             
             # Generate comparison visualization
-            comparison_fig = plot_method_comparison(df_komunitas, cbf_scores_norm, cf_scores_norm, 
-                                                   user_idx=sample_user_idx, top_n=5)
-            st.pyplot(comparison_fig)
+            comparison_chart = plot_method_comparison(df_komunitas, cbf_scores_norm, cf_scores_norm, 
+                                                     user_idx=sample_user_idx, top_n=5)
+            st.altair_chart(comparison_chart)
             
             # Analyze overlap between recommendations
             overlap_analysis = analyze_recommendation_overlap(df_komunitas, cbf_scores_norm, cf_scores_norm, 
@@ -1068,23 +1193,31 @@ if df_mahasiswa is not None and df_komunitas is not None:
             # === 7. DETAILED RECOMMENDATION DISPLAY ===
             st.header("📋 Detail Rekomendasi Per Mahasiswa")
             
+            # Lookup posisi baris berdasarkan ID (pengganti boolean mask berulang)
+            mhs_pos = {}
+            for p, mhs_id in enumerate(df_mahasiswa['id_mahasiswa']):
+                mhs_pos.setdefault(mhs_id, p)
+            kom_pos = {}
+            for p, kom_id in enumerate(df_komunitas['id_komunitas']):
+                kom_pos.setdefault(kom_id, p)
+            nama_mahasiswa = df_mahasiswa['nama_mahasiswa'].to_numpy()
+            
             # Select a student to show recommendations for
             selected_user = st.selectbox(
                 "Pilih Mahasiswa:", 
                 df_mahasiswa['id_mahasiswa'].tolist(),
-                format_func=lambda x: df_mahasiswa[df_mahasiswa['id_mahasiswa'] == x]['nama_mahasiswa'].iloc[0]
+                format_func=lambda x: nama_mahasiswa[mhs_pos[x]]
             )
             
-            nama_selected = df_mahasiswa[df_mahasiswa['id_mahasiswa'] == selected_user]['nama_mahasiswa'].values[0]
+            selected_idx = mhs_pos[selected_user]
+            nama_selected = nama_mahasiswa[selected_idx]
             st.subheader(f"Rekomendasi untuk {nama_selected}")
             
             # Display student profile
-            selected_profile = df_mahasiswa[df_mahasiswa['id_mahasiswa'] == selected_user]['profil_mahasiswa'].values[0]
+            selected_profile = df_mahasiswa['profil_mahasiswa'].iloc[selected_idx]
             st.write("**Profil Mahasiswa:**", selected_profile)
             
             # Display student ratings if available
-            selected_idx = df_mahasiswa[df_mahasiswa['id_mahasiswa'] == selected_user].index[0]
-            
             if original_rating_cols:
                 with st.expander("Rating yang Diberikan"):
                     user_ratings = df_mahasiswa.iloc[selected_idx][original_rating_cols]
@@ -1116,6 +1249,7 @@ if df_mahasiswa is not None and df_komunitas is not None:
                         plt.xticks(rotation=0)
                         plt.tight_layout()
                         st.pyplot(fig)
+                        plt.close(fig)
                     else:
                         st.write("Tidak ada rating yang diberikan.")
             
@@ -1123,16 +1257,14 @@ if df_mahasiswa is not None and df_komunitas is not None:
             st.write("**Top Rekomendasi:**")
             
             for idx, komunitas_id in enumerate(recommendations[selected_user]):
-                if komunitas_id in df_komunitas['id_komunitas'].values:
-                    komunitas_info = df_komunitas[df_komunitas['id_komunitas'] == komunitas_id].iloc[0]
+                if komunitas_id in kom_pos:
+                    kom_idx = kom_pos[komunitas_id]
+                    komunitas_info = df_komunitas.iloc[kom_idx]
                     
                     # Find this recommendation's scores
-                    i = df_mahasiswa[df_mahasiswa['id_mahasiswa'] == selected_user].index[0]
-                    kom_idx = df_komunitas[df_komunitas['id_komunitas'] == komunitas_id].index[0]
-                    
-                    hybrid_score = hybrid_scores[i][kom_idx]
-                    cbf_score = cbf_scores_norm[i][kom_idx]
-                    cf_score = cf_scores_norm[i][kom_idx]
+                    hybrid_score = hybrid_scores[selected_idx, kom_idx]
+                    cbf_score = cbf_scores_norm[selected_idx, kom_idx]
+                    cf_score = cf_scores_norm[selected_idx, kom_idx]
                     
                     with st.container():
                         col1, col2 = st.columns([3, 1])
@@ -1363,10 +1495,12 @@ def evaluate_recommendations_from_joined(df_mahasiswa, df_komunitas, hybrid_scor
     # Siapkan hasil rekomendasi untuk setiap pengguna
     recommendations = {}
     
+    # Dapatkan indeks top-k rekomendasi untuk semua mahasiswa sekaligus
+    top_idx = top_n_indices(hybrid_scores, k)
+    
     # Untuk setiap mahasiswa
     for i, mhs_id in enumerate(df_mahasiswa["id_mahasiswa"]):
-        # Dapatkan indeks top-k rekomendasi
-        idx_top = np.argsort(hybrid_scores[i])[::-1][:k]
+        idx_top = top_idx[i]
         # Simpan daftar ID komunitas yang direkomendasikan
         recommendations[mhs_id] = [df_komunitas["id_komunitas"].iloc[idx] for idx in idx_top]
     
@@ -1423,10 +1557,12 @@ def evaluate_recommendations(df_mahasiswa, df_komunitas, hybrid_scores, k=5, rat
     # Siapkan hasil rekomendasi untuk setiap pengguna
     recommendations = {}
     
+    # Dapatkan indeks top-k rekomendasi untuk semua mahasiswa sekaligus
+    top_idx = top_n_indices(hybrid_scores, k)
+    
     # Untuk setiap mahasiswa
     for i, mhs_id in enumerate(df_mahasiswa["id_mahasiswa"]):
-        # Dapatkan indeks top-k rekomendasi
-        idx_top = np.argsort(hybrid_scores[i])[::-1][:k]
+        idx_top = top_idx[i]
         # Simpan daftar ID komunitas yang direkomendasikan
         recommendations[mhs_id] = [df_komunitas["id_komunitas"].iloc[idx] for idx in idx_top]
     
@@ -1504,8 +1640,9 @@ if df_mahasiswa is not None and len(df_mahasiswa) > 1:  # Evaluasi jika ada mini
             with st.spinner("Menghitung metrik evaluasi..."):
                 # Siapkan rekomendasi untuk semua pengguna
                 recommendations = {}
+                top_idx = top_n_indices(hybrid_scores, eval_k)
                 for i, mhs_id in enumerate(df_mahasiswa["id_mahasiswa"]):
-                    idx_top = np.argsort(hybrid_scores[i])[::-1][:eval_k]
+                    idx_top = top_idx[i]
                     recommendations[mhs_id] = [df_komunitas["id_komunitas"].iloc[idx] for idx in idx_top]
                 
                 # Pilih metode evaluasi berdasarkan sumber ground truth
@@ -1618,6 +1755,7 @@ if df_mahasiswa is not None and len(df_mahasiswa) > 1:  # Evaluasi jika ada mini
                             ax.legend()
                         
                         st.pyplot(fig)
+                        plt.close(fig)
 
 else:
     st.subheader("5️⃣.1 Evaluasi Hasil Rekomendasi")